@@ -10,8 +10,14 @@ def main():
         default=None,
         help="Path to Apple Notes database file. Will use OS default if not provided.",
     )
+    parser.add_argument(
+        "--index-path",
+        default=None,
+        help="Path to the full-text search index file. Defaults to a file in "
+        "~/Library/Caches/apple-notes-mcp named after the database path.",
+    )
     args = parser.parse_args()
-    asyncio.run(server.main(args.db_path))
+    asyncio.run(server.main(args.db_path, args.index_path))
 
 
 # Optionally expose other important items at package level
@@ -1,22 +1,619 @@
 import sqlite3
 import logging
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from contextlib import closing
 from pathlib import Path
 from typing import Any, List, Dict
+import hashlib
 import os
 import stat
+import sys
+import threading
+import zlib
+
+# Prefer the compiled upb protobuf runtime over the pure-Python parser. This
+# has to be set before google.protobuf is first imported.
+os.environ.setdefault("PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION", "upb")
+
+from .proto.notestore_pb2 import NoteStoreProto  # noqa: E402
+
+try:
+    # python-isal's zlib is a drop-in replacement that inflates gzip 2-3x faster
+    from isal import isal_zlib as _zlib
+except ImportError:
+    _zlib = zlib
 
 logger = logging.getLogger(__name__)
 
+# Search queries starting with this prefix only match titles beginning with the rest
+TITLE_PREFIX_QUERY = "title:"
+
+# Directory holding the sidecar full-text index, one file per Notes database;
+# the Apple Notes database itself is never written to
+DEFAULT_INDEX_DIR = "~/Library/Caches/apple-notes-mcp"
+
+
+# Read-side tuning for the Notes connection: memory-map up to 256 MiB of the
+# database, allow a 64 MiB page cache and keep temporary sort data in memory
+_SQL_CONNECTION_PRAGMAS = """
+    PRAGMA mmap_size = 268435456;
+    PRAGMA cache_size = -65536;
+    PRAGMA temp_store = MEMORY;
+    PRAGMA query_only = 1;
+"""
+
+# Queries are module-level constants so the connection's statement cache
+# can reuse the compiled statements across calls
+_SQL_ALL_NOTES = """
+    SELECT
+        note.z_pk AS pk,
+        note.ztitle1 AS title,
+        folder.ztitle2 AS folder,
+        datetime(note.zmodificationdate1 + 978307200, 'unixepoch') AS modifiedAt,
+        note.zsnippet AS snippet,
+        acc.zname AS account,
+        note.zidentifier AS UUID,
+        (note.zispasswordprotected = 1) as locked,
+        (note.zispinned = 1) as pinned,
+        (note.zhaschecklist = 1) as checklist,
+        (note.zhaschecklistinprogress = 1) as checklistInProgress
+    FROM 
+        ziccloudsyncingobject AS note
+    INNER JOIN ziccloudsyncingobject AS folder 
+        ON note.zfolder = folder.z_pk
+    LEFT JOIN ziccloudsyncingobject AS acc 
+        ON note.zaccount4 = acc.z_pk
+    WHERE
+        note.ztitle1 IS NOT NULL AND
+        note.zmodificationdate1 IS NOT NULL AND
+        note.z_pk IS NOT NULL AND
+        note.zmarkedfordeletion != 1 AND
+        folder.zmarkedfordeletion != 1
+    ORDER BY
+        note.zmodificationdate1 DESC
+"""
+
+# Keyset pagination over (zmodificationdate1, z_pk), newest first. Unlike
+# OFFSET, later pages don't rescan the rows that came before them
+_SQL_NOTES_PAGE = """
+    SELECT
+        note.z_pk AS pk,
+        note.ztitle1 AS title,
+        folder.ztitle2 AS folder,
+        datetime(note.zmodificationdate1 + 978307200, 'unixepoch') AS modifiedAt,
+        note.zsnippet AS snippet,
+        acc.zname AS account,
+        note.zidentifier AS UUID,
+        (note.zispasswordprotected = 1) as locked,
+        (note.zispinned = 1) as pinned,
+        (note.zhaschecklist = 1) as checklist,
+        (note.zhaschecklistinprogress = 1) as checklistInProgress,
+        note.zmodificationdate1 AS modificationDate
+    FROM 
+        ziccloudsyncingobject AS note
+    INNER JOIN ziccloudsyncingobject AS folder 
+        ON note.zfolder = folder.z_pk
+    LEFT JOIN ziccloudsyncingobject AS acc 
+        ON note.zaccount4 = acc.z_pk
+    WHERE
+        note.ztitle1 IS NOT NULL AND
+        note.zmodificationdate1 IS NOT NULL AND
+        note.z_pk IS NOT NULL AND
+        note.zmarkedfordeletion != 1 AND
+        folder.zmarkedfordeletion != 1 AND
+        (note.zmodificationdate1, note.z_pk) < (?, ?)
+    ORDER BY
+        note.zmodificationdate1 DESC,
+        note.z_pk DESC
+    LIMIT ?
+"""
+
+_SQL_NOTE_BY_TITLE = """
+    SELECT
+        note.z_pk AS pk,
+        note.ztitle1 AS title,
+        folder.ztitle2 AS folder,
+        datetime(note.zmodificationdate1 + 978307200, 'unixepoch') AS modifiedAt,
+        datetime(note.zcreationdate1 + 978307200, 'unixepoch') AS createdAt,
+        note.zsnippet AS snippet,
+        notedata.zdata AS content,
+        acc.zname AS account,
+        note.zidentifier AS UUID,
+        (note.zispasswordprotected = 1) as locked,
+        (note.zispinned = 1) as pinned,
+        (note.zhaschecklist = 1) as checklist,
+        (note.zhaschecklistinprogress = 1) as checklistInProgress
+    FROM 
+        ziccloudsyncingobject AS note
+    INNER JOIN ziccloudsyncingobject AS folder 
+        ON note.zfolder = folder.z_pk
+    LEFT JOIN ziccloudsyncingobject AS acc 
+        ON note.zaccount4 = acc.z_pk
+    LEFT JOIN zicnotedata AS notedata
+        ON note.znotedata = notedata.z_pk
+    WHERE
+        note.ztitle1 = ? AND
+        note.zmarkedfordeletion != 1 AND
+        folder.zmarkedfordeletion != 1
+    LIMIT 1
+"""
+
+# LIKE fallback for search. Matches are split into title, snippet and content
+# branches so a row is only checked against the expensive zdata blob when
+# neither its title nor its snippet already matched. The pattern is bound
+# once through the p CTE and shared by every branch. Rows come back unsorted
+# and are ranked in Python by _search_rank_key.
+_SQL_SEARCH_NOTES = """
+    WITH p(pat) AS (VALUES (?)),
+    matches(pk, relevance) AS (
+        SELECT note.z_pk, 3
+        FROM ziccloudsyncingobject AS note
+        WHERE note.ztitle1 LIKE (SELECT pat FROM p)
+        UNION ALL
+        SELECT note.z_pk, 2
+        FROM ziccloudsyncingobject AS note
+        WHERE
+            note.zsnippet LIKE (SELECT pat FROM p) AND
+            (note.ztitle1 LIKE (SELECT pat FROM p)) IS NOT 1
+        UNION ALL
+        SELECT note.z_pk, 1
+        FROM ziccloudsyncingobject AS note
+        INNER JOIN zicnotedata AS notedata
+            ON note.znotedata = notedata.z_pk
+        WHERE
+            note.zmarkedfordeletion != 1 AND
+            (note.ztitle1 LIKE (SELECT pat FROM p)) IS NOT 1 AND
+            (note.zsnippet LIKE (SELECT pat FROM p)) IS NOT 1 AND
+            notedata.zdata LIKE (SELECT pat FROM p)
+    )
+    SELECT
+        note.z_pk AS pk,
+        note.ztitle1 AS title,
+        folder.ztitle2 AS folder,
+        datetime(note.zmodificationdate1 + 978307200, 'unixepoch') AS modifiedAt,
+        datetime(note.zcreationdate1 + 978307200, 'unixepoch') AS createdAt,
+        note.zsnippet AS snippet,
+        acc.zname AS account,
+        note.zidentifier AS UUID,
+        (note.zispasswordprotected = 1) as locked,
+        (note.zispinned = 1) as pinned,
+        (note.zhaschecklist = 1) as checklist,
+        (note.zhaschecklistinprogress = 1) as checklistInProgress,
+        matches.relevance as relevance,
+        note.zmodificationdate1 AS modificationDate
+    FROM
+        matches
+    INNER JOIN ziccloudsyncingobject AS note
+        ON note.z_pk = matches.pk
+    INNER JOIN ziccloudsyncingobject AS folder
+        ON note.zfolder = folder.z_pk
+    LEFT JOIN ziccloudsyncingobject AS acc
+        ON note.zaccount4 = acc.z_pk
+    WHERE
+        note.zmarkedfordeletion != 1 AND
+        folder.zmarkedfordeletion != 1
+"""
+
+# Anchored title search written as a range so SQLite can seek on ztitle1
+# (BINARY collation) instead of scanning with LIKE
+_SQL_SEARCH_TITLE_PREFIX = """
+    SELECT
+        note.z_pk AS pk,
+        note.ztitle1 AS title,
+        folder.ztitle2 AS folder,
+        datetime(note.zmodificationdate1 + 978307200, 'unixepoch') AS modifiedAt,
+        datetime(note.zcreationdate1 + 978307200, 'unixepoch') AS createdAt,
+        note.zsnippet AS snippet,
+        acc.zname AS account,
+        note.zidentifier AS UUID,
+        (note.zispasswordprotected = 1) as locked,
+        (note.zispinned = 1) as pinned,
+        (note.zhaschecklist = 1) as checklist,
+        (note.zhaschecklistinprogress = 1) as checklistInProgress,
+        3 as relevance
+    FROM
+        ziccloudsyncingobject AS note
+    INNER JOIN ziccloudsyncingobject AS folder
+        ON note.zfolder = folder.z_pk
+    LEFT JOIN ziccloudsyncingobject AS acc
+        ON note.zaccount4 = acc.z_pk
+    WHERE
+        note.ztitle1 >= ? AND
+        note.ztitle1 < ? AND
+        note.zmarkedfordeletion != 1 AND
+        folder.zmarkedfordeletion != 1
+    ORDER BY
+        note.zmodificationdate1 DESC
+"""
+
+# Same search as a GLOB pattern, for prefixes whose range has no upper bound
+# that SQLite can store (see search_notes_by_title_prefix)
+_SQL_SEARCH_TITLE_GLOB = """
+    SELECT
+        note.z_pk AS pk,
+        note.ztitle1 AS title,
+        folder.ztitle2 AS folder,
+        datetime(note.zmodificationdate1 + 978307200, 'unixepoch') AS modifiedAt,
+        datetime(note.zcreationdate1 + 978307200, 'unixepoch') AS createdAt,
+        note.zsnippet AS snippet,
+        acc.zname AS account,
+        note.zidentifier AS UUID,
+        (note.zispasswordprotected = 1) as locked,
+        (note.zispinned = 1) as pinned,
+        (note.zhaschecklist = 1) as checklist,
+        (note.zhaschecklistinprogress = 1) as checklistInProgress,
+        3 as relevance
+    FROM
+        ziccloudsyncingobject AS note
+    INNER JOIN ziccloudsyncingobject AS folder
+        ON note.zfolder = folder.z_pk
+    LEFT JOIN ziccloudsyncingobject AS acc
+        ON note.zaccount4 = acc.z_pk
+    WHERE
+        note.ztitle1 GLOB ? AND
+        note.zmarkedfordeletion != 1 AND
+        folder.zmarkedfordeletion != 1
+    ORDER BY
+        note.zmodificationdate1 DESC
+"""
+
+_SQL_NOTE_CONTENT = """
+    SELECT
+        note.z_pk AS pk,
+        note.ztitle1 AS title,
+        folder.ztitle2 AS folder,
+        datetime(note.zmodificationdate1 + 978307200, 'unixepoch') AS modifiedAt,
+        datetime(note.zcreationdate1 + 978307200, 'unixepoch') AS createdAt,
+        note.zsnippet AS snippet,
+        note.znotedata AS contentId,
+        acc.zname AS account,
+        note.zidentifier AS UUID,
+        (note.zispasswordprotected = 1) as locked,
+        (note.zispinned = 1) as pinned
+    FROM 
+        ziccloudsyncingobject AS note
+    INNER JOIN ziccloudsyncingobject AS folder 
+        ON note.zfolder = folder.z_pk
+    LEFT JOIN ziccloudsyncingobject AS acc 
+        ON note.zaccount4 = acc.z_pk
+    WHERE
+        note.z_pk = ? AND
+        note.zmarkedfordeletion != 1 AND
+        folder.zmarkedfordeletion != 1
+    LIMIT 1
+"""
+
+# Batch form of _SQL_NOTE_CONTENT for reading several notes at once. The blobs
+# are selected inline because they are shipped to worker processes anyway
+_SQL_NOTES_CONTENT = """
+    SELECT
+        note.z_pk AS pk,
+        note.ztitle1 AS title,
+        folder.ztitle2 AS folder,
+        datetime(note.zmodificationdate1 + 978307200, 'unixepoch') AS modifiedAt,
+        datetime(note.zcreationdate1 + 978307200, 'unixepoch') AS createdAt,
+        note.zsnippet AS snippet,
+        notedata.zdata AS content,
+        acc.zname AS account,
+        note.zidentifier AS UUID,
+        (note.zispasswordprotected = 1) as locked,
+        (note.zispinned = 1) as pinned
+    FROM
+        ziccloudsyncingobject AS note
+    INNER JOIN ziccloudsyncingobject AS folder
+        ON note.zfolder = folder.z_pk
+    LEFT JOIN ziccloudsyncingobject AS acc
+        ON note.zaccount4 = acc.z_pk
+    LEFT JOIN zicnotedata AS notedata
+        ON note.znotedata = notedata.z_pk
+    WHERE
+        note.z_pk IN ({placeholders}) AND
+        note.zmarkedfordeletion != 1 AND
+        folder.zmarkedfordeletion != 1
+"""
+
+_SQL_SEARCH_NOTES_FTS = """
+    SELECT
+        note.z_pk AS pk,
+        note.ztitle1 AS title,
+        folder.ztitle2 AS folder,
+        datetime(note.zmodificationdate1 + 978307200, 'unixepoch') AS modifiedAt,
+        datetime(note.zcreationdate1 + 978307200, 'unixepoch') AS createdAt,
+        note.zsnippet AS snippet,
+        acc.zname AS account,
+        note.zidentifier AS UUID,
+        (note.zispasswordprotected = 1) as locked,
+        (note.zispinned = 1) as pinned,
+        (note.zhaschecklist = 1) as checklist,
+        (note.zhaschecklistinprogress = 1) as checklistInProgress,
+        -bm25(notes_fts, 3.0, 2.0, 1.0) as relevance
+    FROM
+        search.notes_fts
+    INNER JOIN ziccloudsyncingobject AS note
+        ON note.z_pk = notes_fts.rowid
+    INNER JOIN ziccloudsyncingobject AS folder
+        ON note.zfolder = folder.z_pk
+    LEFT JOIN ziccloudsyncingobject AS acc
+        ON note.zaccount4 = acc.z_pk
+    WHERE
+        notes_fts MATCH ? AND
+        note.zmarkedfordeletion != 1 AND
+        folder.zmarkedfordeletion != 1
+    ORDER BY
+        relevance DESC,
+        note.zmodificationdate1 DESC
+"""
+
+# Modification stamps of every live note, compared against the search index
+# to find notes that need to be (re)indexed
+_SQL_NOTE_VERSIONS = """
+    SELECT
+        note.z_pk AS pk,
+        note.zmodificationdate1 AS modified
+    FROM
+        ziccloudsyncingobject AS note
+    INNER JOIN ziccloudsyncingobject AS folder
+        ON note.zfolder = folder.z_pk
+    WHERE
+        note.ztitle1 IS NOT NULL AND
+        note.zmarkedfordeletion != 1 AND
+        folder.zmarkedfordeletion != 1
+"""
+
+_SQL_INDEX_SOURCE = """
+    SELECT
+        note.z_pk AS pk,
+        note.zmodificationdate1 AS modified,
+        note.ztitle1 AS title,
+        note.zsnippet AS snippet,
+        notedata.zdata AS content
+    FROM
+        ziccloudsyncingobject AS note
+    LEFT JOIN zicnotedata AS notedata
+        ON note.znotedata = notedata.z_pk
+    WHERE
+        note.z_pk IN ({placeholders})
+"""
+
+_SQL_SEARCH_INDEX_SCHEMA = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts
+        USING fts5(title, snippet, content, tokenize='trigram');
+    CREATE TABLE IF NOT EXISTS indexed_notes (
+        pk INTEGER PRIMARY KEY,
+        modified REAL
+    );
+    CREATE TABLE IF NOT EXISTS index_meta (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    );
+"""
+
+# Number of notes decoded and written to the search index per batch
+_INDEX_BATCH_SIZE = 200
+
+
+# Read size when streaming note blobs out of SQLite
+_BLOB_CHUNK_SIZE = 64 * 1024
+
+# Most recently decoded notes, keyed by a blake2b digest of the raw blob
+_DECODE_CACHE_SIZE = 256
+_decode_cache: OrderedDict[bytes, str] = OrderedDict()
+_decode_cache_lock = threading.Lock()
+_NOT_CACHED = object()
+
+# Worker processes for decode_notes_content, started on first use
+_decode_executor: ProcessPoolExecutor | None = None
+_decode_executor_lock = threading.Lock()
+
+# Batches with fewer compressed bytes than this are decoded in-process.
+# Decoding runs at about 230 ms per MiB on one core, while starting the
+# spawned workers costs about 600 ms and shipping blobs to them about 25 ms
+# per MiB, so below a few MiB the pool is slower than decoding serially
+_POOL_MIN_BYTES = 4 * 1024 * 1024
+
+
+def _inflate_blob(blob: sqlite3.Blob) -> bytearray | None:
+    """Stream a gzipped blob through the decompressor one chunk at a time"""
+    chunk = blob.read(_BLOB_CHUNK_SIZE)
+    if not chunk.startswith(b"\x1f\x8b"):
+        return None
+    inflater = _zlib.decompressobj(16 + zlib.MAX_WBITS)
+    decompressed = bytearray()
+    while chunk:
+        decompressed += inflater.decompress(chunk)
+        chunk = blob.read(_BLOB_CHUNK_SIZE)
+    decompressed += inflater.flush()
+    return decompressed
+
+
+def _parse_note_store(content: bytes | sqlite3.Blob) -> NoteStoreProto | None:
+    """Decompress a gzipped note payload and parse it into a NoteStoreProto"""
+    if isinstance(content, sqlite3.Blob):
+        decompressed = _inflate_blob(content)
+        if decompressed is None:
+            return None
+    elif content.startswith(b"\x1f\x8b"):
+        decompressed = _zlib.decompress(content, 16 + zlib.MAX_WBITS)
+    else:
+        return None
+
+    note_store = NoteStoreProto()
+    note_store.ParseFromString(decompressed)
+    return note_store
+
+
+def _extract_note_text(content: bytes | None) -> str:
+    """Return only the plain text of a note, used to populate the search index"""
+    if not content:
+        return ""
+    try:
+        note_store = _parse_note_store(content)
+    except Exception as e:
+        logger.debug(f"Could not extract note text for indexing: {e}")
+        return ""
+    if note_store and note_store.document and note_store.document.note:
+        return note_store.document.note.note_text
+    return ""
+
+
+def _content_digest(content: bytes) -> bytes:
+    return hashlib.blake2b(content, digest_size=16).digest()
+
+
+def _get_cached_decode(digest: bytes) -> str | object:
+    """Return the cached decoding for a digest, or _NOT_CACHED"""
+    with _decode_cache_lock:
+        if digest not in _decode_cache:
+            return _NOT_CACHED
+        _decode_cache.move_to_end(digest)
+        return _decode_cache[digest]
+
+
+def _cache_decode(digest: bytes, decoded: str):
+    with _decode_cache_lock:
+        _decode_cache[digest] = decoded
+        if len(_decode_cache) > _DECODE_CACHE_SIZE:
+            _decode_cache.popitem(last=False)
+
+
+def decode_notes_content(contents: list[bytes | None]) -> list[str]:
+    """
+    Decode several notes from Apple Notes binary format using protobuf decoder.
+    Uses schema from: https://github.com/HamburgChimps/apple-notes-liberator
+    Decoded text is cached by a digest of each blob, so re-reading an
+    unchanged note skips decompression and parsing. Large batches of notes
+    missing from the cache are decompressed and parsed in worker processes,
+    so they are not serialized behind the GIL.
+    """
+    digests = [_content_digest(content) if content else None for content in contents]
+    decoded: dict[bytes, str] = {}
+    pending: dict[bytes, bytes] = {}
+    for digest, content in zip(digests, contents):
+        if digest is None or digest in decoded or digest in pending:
+            continue
+        cached = _get_cached_decode(digest)
+        if cached is _NOT_CACHED:
+            pending[digest] = content
+        else:
+            decoded[digest] = cached
+
+    workers = os.cpu_count() or 1
+    if workers > 1 and sum(map(len, pending.values())) >= _POOL_MIN_BYTES:
+        # A few chunks per worker keeps the IPC round trips down
+        texts = _get_decode_executor().map(
+            _render_note_content,
+            pending.values(),
+            chunksize=max(1, len(pending) // (workers * 4)),
+        )
+    else:
+        texts = map(_render_note_content, pending.values())
+    for digest, text in zip(pending, texts):
+        _cache_decode(digest, text)
+        decoded[digest] = text
+
+    return [
+        decoded[digest] if digest is not None else "Note has no content"
+        for digest in digests
+    ]
+
+
+def _get_decode_executor() -> ProcessPoolExecutor:
+    """Create the shared process pool for batch decoding on first use"""
+    global _decode_executor
+    with _decode_executor_lock:
+        if _decode_executor is None:
+            _decode_executor = ProcessPoolExecutor(max_workers=os.cpu_count())
+        return _decode_executor
+
+
+def _shutdown_decode_executor():
+    """Stop the batch decoding workers, if they were started"""
+    global _decode_executor
+    with _decode_executor_lock:
+        if _decode_executor is not None:
+            _decode_executor.shutdown()
+            _decode_executor = None
+
+
+def _render_note_content(content: bytes | sqlite3.Blob) -> str:
+    """Decompress and parse a note payload into its text and formatting summary"""
+    try:
+        note_store = _parse_note_store(content)
+        if note_store is not None:
+            # Extract note text and formatting
+            if note_store.document and note_store.document.note:
+                note = note_store.document.note
+
+                # Start with the basic text
+                output = [note.note_text]
+
+                # Add formatting information if available
+                # Might not need this for LLM needs
+                runs = note.attribute_run
+                if runs:
+                    # Attribute lookups are hoisted out of the loop and each field
+                    # is read once, as notes can carry thousands of runs
+                    append = output.append
+                    append("\nFormatting:")
+                    for run in runs:
+                        fmt = []
+                        font_weight = run.font_weight
+                        if font_weight:
+                            fmt.append(f"weight: {font_weight}")
+                        if run.underlined:
+                            fmt.append("underlined")
+                        if run.strikethrough:
+                            fmt.append("strikethrough")
+                        if run.HasField("paragraph_style"):
+                            style_type = run.paragraph_style.style_type
+                            if style_type != -1:
+                                fmt.append(f"style: {style_type}")
+                        if fmt:
+                            append(f"- length {run.length}: {', '.join(fmt)}")
+
+                return "\n".join(output)
+            return "No note content found"
+
+    except Exception as e:
+        return f"Error processing note content: {str(e)}"
+
+
+def _search_rank_key(note: dict[str, Any]) -> tuple[int, float]:
+    """Order LIKE search hits by relevance, then most recently modified"""
+    modified = note["modificationDate"]
+    return note["relevance"], modified if modified is not None else float("-inf")
+
+
+def _dict_factory(cursor: sqlite3.Cursor, row: tuple) -> dict[str, Any]:
+    """Build result rows as dicts directly instead of copying sqlite3.Row objects"""
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
 
 class NotesDatabase:
     def __init__(
         self,
         db_path: str = "~/Library/Group Containers/group.com.apple.notes/NoteStore.sqlite",
+        index_path: str | None = None,
+        search_index: bool = True,
     ):
         self.db_path = str(Path(db_path).expanduser())
+        if index_path is None:
+            # Each Notes database gets its own sidecar, so two servers reading
+            # different databases never overwrite each other's index
+            digest = hashlib.sha256(str(Path(self.db_path).resolve()).encode())
+            index_path = f"{DEFAULT_INDEX_DIR}/index-{digest.hexdigest()[:16]}.sqlite"
+        self.index_path = str(Path(index_path).expanduser()) if search_index else None
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._store_uuid: str | None = None
+        self._id_prefix: str | None = None
+        self._index: sqlite3.Connection | None = None
+        # data_version of the Notes database and the sidecar after the last refresh
+        self._index_versions: tuple[int, int] | None = None
         self._validate_path()
         self._init_database()
+        self._init_search_index()
 
     def _validate_path(self):
         """Validate database path and permissions"""
@@ -47,17 +644,36 @@ class NotesDatabase:
         logger.debug("Initializing database connection")
         logger.info(f"Initializing database with path: {self.db_path}")
         try:
-            with closing(sqlite3.connect(self.db_path)) as conn:
-                conn.row_factory = sqlite3.Row
-                # Verify we can access key Apple Notes tables
-                cursor = conn.cursor()
+            # One long-lived, read-only connection keeps SQLite's page cache warm
+            # across requests and never takes write locks on the Notes database
+            conn = sqlite3.connect(
+                f"{Path(self.db_path).absolute().as_uri()}?mode=ro",
+                uri=True,
+                check_same_thread=False,
+                isolation_level=None,
+            )
+            conn.row_factory = _dict_factory
+            conn.executescript(_SQL_CONNECTION_PRAGMAS)
+            # Verify we can access key Apple Notes tables
+            with closing(conn.cursor()) as cursor:
                 cursor.execute(
                     "SELECT name FROM sqlite_master WHERE type='table' AND name='ZICCLOUDSYNCINGOBJECT'"
                 )
-                if not cursor.fetchone():
-                    raise ValueError(
-                        "This doesn't appear to be an Apple Notes database - missing required tables"
-                    )
+                found = cursor.fetchone()
+                if found:
+                    # The store UUID is constant, so note IDs are built from it in
+                    # Python instead of joining z_metadata into every query
+                    cursor.execute("SELECT z_uuid AS uuid FROM z_metadata LIMIT 1")
+                    store = cursor.fetchone()
+            if not found:
+                conn.close()
+                raise ValueError(
+                    "This doesn't appear to be an Apple Notes database - missing required tables"
+                )
+            if store and store["uuid"] is not None:
+                self._store_uuid = store["uuid"]
+                self._id_prefix = f"x-coredata://{store['uuid']}/ICNote/p"
+            self._conn = conn
         except sqlite3.Error as e:
             if "database is locked" in str(e):
                 raise RuntimeError(
@@ -76,183 +692,310 @@ class NotesDatabase:
                 logger.error(f"Failed to initialize database: {e}")
                 raise
 
+    def _init_search_index(self):
+        """
+        Open the full-text search index kept in a sidecar database.
+        The Apple Notes database is never written to; if FTS5 with the
+        trigram tokenizer is unavailable, search falls back to LIKE queries.
+        """
+        if not self.index_path:
+            return
+        try:
+            # The index holds the plain text of every note outside the folder
+            # macOS protects with Full Disk Access, so only the user may read it
+            index_dir = Path(self.index_path).parent
+            index_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+            if index_dir == Path(DEFAULT_INDEX_DIR).expanduser():
+                os.chmod(index_dir, 0o700)
+            os.close(os.open(self.index_path, os.O_RDWR | os.O_CREAT, 0o600))
+            os.chmod(self.index_path, 0o600)
+            index = sqlite3.connect(self.index_path, check_same_thread=False)
+            try:
+                index.executescript(_SQL_SEARCH_INDEX_SCHEMA)
+                self._conn.execute("ATTACH DATABASE ? AS search", (self.index_path,))
+            except sqlite3.Error:
+                index.close()
+                raise
+            self._index = index
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(
+                f"Full-text search index unavailable, using LIKE search: {e}"
+            )
+
+    def _claim_search_index(self):
+        """
+        Empty the search index if it was built from another Notes database,
+        e.g. when two databases are given the same index path
+        """
+        source = f"{self._store_uuid}:{Path(self.db_path).resolve()}"
+        with self._lock:
+            row = self._index.execute(
+                "SELECT value FROM index_meta WHERE key = 'source'"
+            ).fetchone()
+            if row is not None and row[0] == source:
+                return
+            if row is not None:
+                logger.info(f"Rebuilding search index built from {row[0]}")
+            with self._index:
+                self._index.execute("DELETE FROM notes_fts")
+                self._index.execute("DELETE FROM indexed_notes")
+                self._index.execute(
+                    "INSERT OR REPLACE INTO index_meta (key, value) VALUES ('source', ?)",
+                    (source,),
+                )
+
+    def refresh_search_index(self):
+        """Re-index notes that were added, changed or removed since the last refresh"""
+        if self._index is None:
+            return
+
+        notes_version = self._data_versions()[0]
+        self._claim_search_index()
+        live = {
+            row["pk"]: row["modified"]
+            for row in self._execute_query(_SQL_NOTE_VERSIONS)
+        }
+        with self._lock:
+            indexed = dict(
+                self._index.execute("SELECT pk, modified FROM indexed_notes")
+            )
+        # Membership is checked explicitly: a note without a modification stamp
+        # has None on both sides of a plain indexed.get(pk) comparison
+        stale = [
+            pk
+            for pk, modified in live.items()
+            if pk not in indexed or indexed[pk] != modified
+        ]
+        removed = [(pk,) for pk in indexed if pk not in live]
+        logger.debug(
+            f"Refreshing search index: {len(stale)} stale, {len(removed)} removed"
+        )
+
+        for start in range(0, len(stale), _INDEX_BATCH_SIZE):
+            batch = stale[start : start + _INDEX_BATCH_SIZE]
+            query = _SQL_INDEX_SOURCE.format(placeholders=", ".join("?" * len(batch)))
+            rows = [
+                (
+                    row["pk"],
+                    row["modified"],
+                    row["title"] or "",
+                    row["snippet"] or "",
+                    _extract_note_text(row["content"]),
+                )
+                for row in self._execute_query(query, batch)
+            ]
+            with self._lock, self._index:
+                self._index.executemany(
+                    "DELETE FROM notes_fts WHERE rowid = ?", [(r[0],) for r in rows]
+                )
+                self._index.executemany(
+                    "INSERT INTO notes_fts (rowid, title, snippet, content) VALUES (?, ?, ?, ?)",
+                    [(r[0], r[2], r[3], r[4]) for r in rows],
+                )
+                self._index.executemany(
+                    "INSERT OR REPLACE INTO indexed_notes (pk, modified) VALUES (?, ?)",
+                    [(r[0], r[1]) for r in rows],
+                )
+
+        if removed:
+            with self._lock, self._index:
+                self._index.executemany(
+                    "DELETE FROM notes_fts WHERE rowid = ?", removed
+                )
+                self._index.executemany(
+                    "DELETE FROM indexed_notes WHERE pk = ?", removed
+                )
+
+        # Our own writes also bump the sidecar's data_version, so it is read
+        # after them; the Notes version is the one the diff above started from
+        self._index_versions = (notes_version, self._data_versions()[1])
+
+    def _data_versions(self) -> tuple[int, int]:
+        """
+        Return PRAGMA data_version of the Notes database and the sidecar.
+        Either changes whenever another connection commits to that file
+        """
+        with self._lock:
+            notes = self._conn.execute("PRAGMA main.data_version").fetchone()
+            index = self._conn.execute("PRAGMA search.data_version").fetchone()
+        return notes["data_version"], index["data_version"]
+
+    def _ensure_search_index(self):
+        """Refresh the search index if either database changed since the last refresh"""
+        if self._data_versions() != self._index_versions:
+            self.refresh_search_index()
+
     def _execute_query(
         self, query: str, params: dict[str, Any] | None = None
     ) -> list[dict[str, Any]]:
         """Execute a SQL query and return results as a list of dictionaries"""
         logger.debug(f"Executing query: {query}")
+        if self._conn is None:
+            raise RuntimeError("Database connection is closed")
         try:
-            with closing(sqlite3.connect(self.db_path)) as conn:
-                conn.row_factory = sqlite3.Row
-                with closing(conn.cursor()) as cursor:
-                    if params:
-                        cursor.execute(query, params)
-                    else:
-                        cursor.execute(query)
-
-                    results = [dict(row) for row in cursor.fetchall()]
-                    logger.debug(f"Query returned {len(results)} rows")
-                    return results
+            with self._lock, closing(self._conn.cursor()) as cursor:
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+
+                results = cursor.fetchall()
+                logger.debug(f"Query returned {len(results)} rows")
+                return results
         except sqlite3.Error as e:
             logger.error(f"Database error executing query: {e}")
             raise
 
+    def _query_notes(
+        self, query: str, params: tuple[Any, ...] | None = None
+    ) -> list[dict[str, Any]]:
+        """Execute a note query and add each note's Core Data ID"""
+        results = self._execute_query(query, params)
+        prefix = self._id_prefix
+        for note in results:
+            note["id"] = prefix + str(note["pk"]) if prefix else None
+        return results
+
+    def close(self):
+        """Close the underlying database connection and stop the decoding workers"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            if self._index is not None:
+                self._index.close()
+                self._index = None
+        _shutdown_decode_executor()
+
     def get_all_notes(self) -> List[Dict[str, Any]]:
         """Retrieve all notes with their metadata"""
-        query = """
-        SELECT
-            'x-coredata://' || zmd.z_uuid || '/ICNote/p' || note.z_pk AS id,
-            note.z_pk AS pk,
-            note.ztitle1 AS title,
-            folder.ztitle2 AS folder,
-            datetime(note.zmodificationdate1 + 978307200, 'unixepoch') AS modifiedAt,
-            note.zsnippet AS snippet,
-            acc.zname AS account,
-            note.zidentifier AS UUID,
-            (note.zispasswordprotected = 1) as locked,
-            (note.zispinned = 1) as pinned,
-            (note.zhaschecklist = 1) as checklist,
-            (note.zhaschecklistinprogress = 1) as checklistInProgress
-        FROM 
-            ziccloudsyncingobject AS note
-        INNER JOIN ziccloudsyncingobject AS folder 
-            ON note.zfolder = folder.z_pk
-        LEFT JOIN ziccloudsyncingobject AS acc 
-            ON note.zaccount4 = acc.z_pk
-        LEFT JOIN z_metadata AS zmd ON 1=1
-        WHERE
-            note.ztitle1 IS NOT NULL AND
-            note.zmodificationdate1 IS NOT NULL AND
-            note.z_pk IS NOT NULL AND
-            note.zmarkedfordeletion != 1 AND
-            folder.zmarkedfordeletion != 1
-        ORDER BY
-            note.zmodificationdate1 DESC
-        """
-        results = self._execute_query(query)
+        results = self._query_notes(_SQL_ALL_NOTES)
 
         return results
 
+    def get_notes_page(
+        self, limit: int, cursor: str | None = None
+    ) -> tuple[List[Dict[str, Any]], str | None]:
+        """
+        Retrieve one page of notes, most recently modified first
+        Returns the notes and a cursor for the next page, or None on the last page
+        """
+        if limit < 1:
+            raise ValueError(f"Invalid limit: {limit}")
+        if cursor:
+            modified, _, pk = cursor.rpartition(":")
+            try:
+                before = (float(modified), int(pk))
+            except ValueError:
+                raise ValueError(f"Invalid cursor: {cursor}")
+        else:
+            # Sorts after every real timestamp, so the page starts at the newest note
+            before = (float("inf"), 0)
+
+        # Fetch one extra row to find out whether another page follows
+        results = self._query_notes(_SQL_NOTES_PAGE, (*before, limit + 1))
+        if len(results) <= limit:
+            return results, None
+        last = results[limit - 1]
+        return results[:limit], f"{last['modificationDate']!r}:{last['pk']}"
+
     def get_note_by_title(self, title: str) -> Dict[str, Any] | None:
         """Retrieve a specific note by its title including content and metadata"""
-        query = """
-        SELECT
-            'x-coredata://' || zmd.z_uuid || '/ICNote/p' || note.z_pk AS id,
-            note.z_pk AS pk,
-            note.ztitle1 AS title,
-            folder.ztitle2 AS folder,
-            datetime(note.zmodificationdate1 + 978307200, 'unixepoch') AS modifiedAt,
-            datetime(note.zcreationdate1 + 978307200, 'unixepoch') AS createdAt,
-            note.zsnippet AS snippet,
-            notedata.zdata AS content,
-            acc.zname AS account,
-            note.zidentifier AS UUID,
-            (note.zispasswordprotected = 1) as locked,
-            (note.zispinned = 1) as pinned,
-            (note.zhaschecklist = 1) as checklist,
-            (note.zhaschecklistinprogress = 1) as checklistInProgress
-        FROM 
-            ziccloudsyncingobject AS note
-        INNER JOIN ziccloudsyncingobject AS folder 
-            ON note.zfolder = folder.z_pk
-        LEFT JOIN ziccloudsyncingobject AS acc 
-            ON note.zaccount4 = acc.z_pk
-        LEFT JOIN zicnotedata AS notedata
-            ON note.znotedata = notedata.z_pk
-        LEFT JOIN z_metadata AS zmd ON 1=1
-        WHERE
-            note.ztitle1 = ? AND
-            note.zmarkedfordeletion != 1 AND
-            folder.zmarkedfordeletion != 1
-        LIMIT 1
-        """
-        results = self._execute_query(query, (title,))
+        results = self._query_notes(_SQL_NOTE_BY_TITLE, (title,))
         return results[0] if results else None
 
     def search_notes(self, query_text: str) -> List[Dict[str, Any]]:
-        """Search notes by title, content, or snippet with ranking by relevance"""
-        query = """
-        SELECT
-            'x-coredata://' || zmd.z_uuid || '/ICNote/p' || note.z_pk AS id,
-            note.z_pk AS pk,
-            note.ztitle1 AS title,
-            folder.ztitle2 AS folder,
-            datetime(note.zmodificationdate1 + 978307200, 'unixepoch') AS modifiedAt,
-            datetime(note.zcreationdate1 + 978307200, 'unixepoch') AS createdAt,
-            note.zsnippet AS snippet,
-            notedata.zdata AS content,
-            acc.zname AS account,
-            note.zidentifier AS UUID,
-            (note.zispasswordprotected = 1) as locked,
-            (note.zispinned = 1) as pinned,
-            (note.zhaschecklist = 1) as checklist,
-            (note.zhaschecklistinprogress = 1) as checklistInProgress,
-            CASE
-                WHEN note.ztitle1 LIKE ? THEN 3
-                WHEN note.zsnippet LIKE ? THEN 2
-                WHEN notedata.zdata LIKE ? THEN 1
-                ELSE 0
-            END as relevance
-        FROM 
-            ziccloudsyncingobject AS note
-        INNER JOIN ziccloudsyncingobject AS folder 
-            ON note.zfolder = folder.z_pk
-        LEFT JOIN ziccloudsyncingobject AS acc 
-            ON note.zaccount4 = acc.z_pk
-        LEFT JOIN zicnotedata AS notedata
-            ON note.znotedata = notedata.z_pk
-        LEFT JOIN z_metadata AS zmd ON 1=1
-        WHERE
-            note.zmarkedfordeletion != 1 AND
-            folder.zmarkedfordeletion != 1 AND
-            (note.ztitle1 LIKE ? OR 
-            note.zsnippet LIKE ? OR 
-            notedata.zdata LIKE ?)
-        ORDER BY 
-            relevance DESC,
-            note.zmodificationdate1 DESC
         """
+        Search notes by title, content, or snippet with ranking by relevance
+        Results carry metadata only; use get_note_content to load the body
+        A query of the form "title:foo" instead matches titles starting with
+        "foo" (case-sensitive), which SQLite can answer with a range scan
+        """
+        if query_text.startswith(TITLE_PREFIX_QUERY):
+            return self.search_notes_by_title_prefix(
+                query_text[len(TITLE_PREFIX_QUERY) :].strip()
+            )
+
+        # The trigram tokenizer cannot match queries shorter than three characters
+        if self._index is not None and len(query_text) >= 3:
+            try:
+                self._ensure_search_index()
+                # Quote the query as a single FTS5 phrase so it matches as a substring
+                phrase = '"' + query_text.replace('"', '""') + '"'
+                return self._query_notes(_SQL_SEARCH_NOTES_FTS, (phrase,))
+            except sqlite3.Error as e:
+                # e.g. the sidecar is locked by another server
+                logger.warning(f"Full-text search failed, using LIKE search: {e}")
+
         search_pattern = f"%{query_text}%"
-        # We need 6 parameters because the pattern is used twice in the query
-        # 3 times for relevance scoring and 3 times for WHERE clause
-        params = (search_pattern,) * 6
+        results = self._query_notes(_SQL_SEARCH_NOTES, (search_pattern,))
+        results.sort(key=_search_rank_key, reverse=True)
+        return results
+
+    def search_notes_by_title_prefix(self, prefix: str) -> List[Dict[str, Any]]:
+        """Retrieve notes whose title starts with the given prefix"""
+        if not prefix:
+            return []
+        # Smallest string sorting after every string that starts with prefix.
+        # There is none after U+10FFFF, and bumping U+D7FF gives a surrogate
+        # that cannot be encoded for SQLite, so those prefixes use GLOB
+        bumped = ord(prefix[-1]) + 1
+        if bumped > sys.maxunicode or 0xD800 <= bumped <= 0xDFFF:
+            pattern = "".join(f"[{c}]" if c in "*?[" else c for c in prefix) + "*"
+            return self._query_notes(_SQL_SEARCH_TITLE_GLOB, (pattern,))
+        upper_bound = prefix[:-1] + chr(bumped)
+        return self._query_notes(_SQL_SEARCH_TITLE_PREFIX, (prefix, upper_bound))
 
-        return self._execute_query(query, params)
+    def get_notes_content(self, note_ids: list[str]) -> List[Dict[str, Any]]:
+        """
+        Retrieve full content and metadata for several notes by ID
+        Notes are returned in the order requested; unknown IDs are skipped
+        """
+        if not note_ids:
+            return []
+        query = _SQL_NOTES_CONTENT.format(placeholders=", ".join("?" * len(note_ids)))
+        by_pk = {str(note["pk"]): note for note in self._query_notes(query, note_ids)}
+        return [by_pk[note_id] for note_id in note_ids if note_id in by_pk]
 
     def get_note_content(self, note_id: str) -> Dict[str, Any] | None:
         """
         Retrieve full note content and metadata by note ID
         This note ID is provided by the resource URI inside Claude
+        The body is not loaded; pass contentId to read_note_content to decode it
         """
-        query = """
-        SELECT
-            'x-coredata://' || zmd.z_uuid || '/ICNote/p' || note.z_pk AS id,
-            note.z_pk AS pk,
-            note.ztitle1 AS title,
-            folder.ztitle2 AS folder,
-            datetime(note.zmodificationdate1 + 978307200, 'unixepoch') AS modifiedAt,
-            datetime(note.zcreationdate1 + 978307200, 'unixepoch') AS createdAt,
-            note.zsnippet AS snippet,
-            notedata.zdata AS content,
-            acc.zname AS account,
-            note.zidentifier AS UUID,
-            (note.zispasswordprotected = 1) as locked,
-            (note.zispinned = 1) as pinned
-        FROM 
-            ziccloudsyncingobject AS note
-        INNER JOIN ziccloudsyncingobject AS folder 
-            ON note.zfolder = folder.z_pk
-        LEFT JOIN ziccloudsyncingobject AS acc 
-            ON note.zaccount4 = acc.z_pk
-        LEFT JOIN zicnotedata AS notedata
-            ON note.znotedata = notedata.z_pk
-        LEFT JOIN z_metadata AS zmd ON 1=1
-        WHERE
-            note.z_pk = ? AND
-            note.zmarkedfordeletion != 1 AND
-            folder.zmarkedfordeletion != 1
-        LIMIT 1
+        results = self._query_notes(_SQL_NOTE_CONTENT, (note_id,))
+        return results[0] if results else None
+
+    def read_note_content(self, content_id: int | None) -> str:
+        """
+        Decode a note body, streaming its zdata blob straight into the
+        decompressor rather than loading the compressed blob into memory first
         """
+        if content_id is None:
+            return "Note has no content"
 
-        results = self._execute_query(query, (note_id,))
-        return results[0] if results else None
+        with self._lock:
+            if self._conn is None:
+                raise RuntimeError("Database connection is closed")
+            try:
+                blob = self._conn.blobopen(
+                    "zicnotedata", "zdata", content_id, readonly=True
+                )
+            except sqlite3.Error:
+                # NULL zdata or a dangling reference
+                return "Note has no content"
+            with blob:
+                if not len(blob):
+                    return "Note has no content"
+                hasher = hashlib.blake2b(digest_size=16)
+                while chunk := blob.read(_BLOB_CHUNK_SIZE):
+                    hasher.update(chunk)
+                digest = hasher.digest()
+                decoded = _get_cached_decode(digest)
+                if decoded is not _NOT_CACHED:
+                    return decoded
+                blob.seek(0)
+                decoded = _render_note_content(blob)
+
+        _cache_decode(digest, decoded)
+        return decoded
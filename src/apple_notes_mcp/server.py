@@ -4,10 +4,9 @@ import mcp.types as types
 from mcp.server import NotificationOptions, Server
 from pydantic import AnyUrl
 import mcp.server.stdio
-from .notes_database import NotesDatabase
-import zlib
-from .proto.notestore_pb2 import NoteStoreProto
+from .notes_database import NotesDatabase, decode_notes_content
 from importlib import metadata
+from google.protobuf.internal import api_implementation
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -18,73 +17,30 @@ notes_db = None
 server = Server("apple-notes-mcp")
 
 
-def decode_note_content(content: bytes | None) -> str:
-    """
-    Decode note content from Apple Notes binary format using protobuf decoder.
-    Uses schema from: https://github.com/HamburgChimps/apple-notes-liberator
-    """
-    if not content:
-        return "Note has no content"
-
-    try:
-        # First decompress gzip
-        if content.startswith(b"\x1f\x8b"):
-            decompressed = zlib.decompress(content, 16 + zlib.MAX_WBITS)
-
-            note_store = NoteStoreProto()
-            note_store.ParseFromString(decompressed)
-
-            # Extract note text and formatting
-            if note_store.document and note_store.document.note:
-                note = note_store.document.note
-
-                # Start with the basic text
-                output = [note.note_text]
-
-                # Add formatting information if available
-                # Might not need this for LLM needs
-                if note.attribute_run:
-                    output.append("\nFormatting:")
-                    for run in note.attribute_run:
-                        fmt = []
-                        if run.font_weight:
-                            fmt.append(f"weight: {run.font_weight}")
-                        if run.underlined:
-                            fmt.append("underlined")
-                        if run.strikethrough:
-                            fmt.append("strikethrough")
-                        if run.paragraph_style and run.paragraph_style.style_type != -1:
-                            fmt.append(f"style: {run.paragraph_style.style_type}")
-                        if fmt:
-                            output.append(f"- length {run.length}: {', '.join(fmt)}")
-
-                return "\n".join(output)
-            return "No note content found"
-
-    except Exception as e:
-        return f"Error processing note content: {str(e)}"
-
-
 @server.list_resources()
 async def handle_list_resources() -> list[types.Resource]:
     """List all notes as resources"""
     all_notes = notes_db.get_all_notes()
-    return [
-        types.Resource(
-            uri=f"notes://local/{note['pk']}",  # Using primary key in URI
-            name=note["title"],
-            description=f"Note in {note['folder']} - Last modified: {note['modifiedAt']}",
-            metadata={
-                "folder": note["folder"],
-                "modified": note["modifiedAt"],
-                "locked": note["locked"],
-                "pinned": note["pinned"],
-                "hasChecklist": note["checklist"],
-            },
-            mimeType="text/plain",
+    resources = []
+    for note in all_notes:
+        folder = note["folder"]
+        modified = note["modifiedAt"]
+        resources.append(
+            types.Resource(
+                uri=f"notes://local/{note['pk']}",  # Using primary key in URI
+                name=note["title"],
+                description=f"Note in {folder} - Last modified: {modified}",
+                metadata={
+                    "folder": folder,
+                    "modified": modified,
+                    "locked": note["locked"],
+                    "pinned": note["pinned"],
+                    "hasChecklist": note["checklist"],
+                },
+                mimeType="text/plain",
+            )
         )
-        for note in all_notes
-    ]
+    return resources
 
 
 @server.read_resource()
@@ -94,11 +50,12 @@ async def handle_read_resource(uri: AnyUrl) -> str:
     Mostly from reading https://ciofecaforensics.com/2020/09/18/apple-notes-revisited-protobuf/
     and I found a gist https://gist.github.com/paultopia/b8a0400cd8406ff85969b722d3a2ebd8
     """
-    if not str(uri).startswith("notes://"):
+    uri_str = str(uri)
+    if not uri_str.startswith("notes://"):
         raise ValueError(f"Unsupported URI scheme: {uri}")
 
     try:
-        note_id = str(uri).split("/")[-1]
+        note_id = uri_str.rpartition("/")[2]
         note = notes_db.get_note_content(note_id)
 
         if not note:
@@ -111,7 +68,7 @@ async def handle_read_resource(uri: AnyUrl) -> str:
         output.append(f"Modified: {note['modifiedAt']}")
         output.append("")  # Empty line between metadata and content
 
-        decoded = decode_note_content(note["content"])
+        decoded = notes_db.read_note_content(note["contentId"])
         if isinstance(decoded, dict):
             # Here we could convert formatting to markdown or other rich text format
             # For now just return the plain text
@@ -125,30 +82,103 @@ async def handle_read_resource(uri: AnyUrl) -> str:
         raise RuntimeError(f"Notes database error: {str(e)}")
 
 
+# Prompt and tool definitions never change, so they are validated once at
+# import time rather than rebuilt on every listing request
+_PROMPTS = [
+    types.Prompt(
+        name="find-note",
+        description="Find notes matching specific criteria",
+        arguments=[
+            types.PromptArgument(
+                name="query",
+                description="What kind of note are you looking for?",
+                required=True,
+            ),
+            types.PromptArgument(
+                name="folder",
+                description="Specific folder to search in",
+                required=False,
+            ),
+        ],
+    )
+]
+
+
 @server.list_prompts()
 async def handle_list_prompts() -> list[types.Prompt]:
     """
     List available prompts.
     Each prompt can have optional arguments to customize its behavior.
     """
-    return [
-        types.Prompt(
-            name="find-note",
-            description="Find notes matching specific criteria",
-            arguments=[
-                types.PromptArgument(
-                    name="query",
-                    description="What kind of note are you looking for?",
-                    required=True,
-                ),
-                types.PromptArgument(
-                    name="folder",
-                    description="Specific folder to search in",
-                    required=False,
-                ),
-            ],
-        )
-    ]
+    return _PROMPTS
+
+
+_TOOLS = [
+    types.Tool(
+        name="get-all-notes",
+        description="Get all notes, most recently modified first",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "limit": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "description": "Maximum number of notes to return. "
+                    "Returns every note if omitted",
+                },
+                "cursor": {
+                    "type": "string",
+                    "description": "Cursor from a previous call to fetch the next page",
+                },
+            },
+        },
+    ),
+    types.Tool(
+        name="read-note",
+        description="Get full content of a specific note",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "note_id": {
+                    "type": "string",
+                    "description": "ID of the note to read",
+                },
+            },
+            "required": ["note_id"],
+        },
+    ),
+    types.Tool(
+        name="read-notes",
+        description="Get full content of several notes at once",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "note_ids": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "IDs of the notes to read",
+                },
+            },
+            "required": ["note_ids"],
+        },
+    ),
+    types.Tool(
+        name="search-notes",
+        description="Search through notes",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "Search query, matched case-insensitively. "
+                    "Use 'title:<text>' to match only titles starting with "
+                    "<text>; title matching is case-sensitive",
+                },
+            },
+            "required": ["query"],
+        },
+    ),
+]
 
 
 @server.list_tools()
@@ -157,41 +187,7 @@ async def handle_list_tools() -> list[types.Tool]:
     List available tools.
     Each tool specifies its arguments using JSON Schema validation.
     """
-    return [
-        types.Tool(
-            name="get-all-notes",
-            description="Get all notes",
-            inputSchema={
-                "type": "object",
-                "properties": {},
-            },
-        ),
-        types.Tool(
-            name="read-note",
-            description="Get full content of a specific note",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "note_id": {
-                        "type": "string",
-                        "description": "ID of the note to read",
-                    },
-                },
-                "required": ["note_id"],
-            },
-        ),
-        types.Tool(
-            name="search-notes",
-            description="Search through notes",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "query": {"type": "string", "description": "Search query"},
-                },
-                "required": ["query"],
-            },
-        ),
-    ]
+    return _TOOLS
 
 
 @server.call_tool()
@@ -206,22 +202,31 @@ async def handle_call_tool(
     if name == "search-notes":
         query = arguments.get("query")
         results = notes_db.search_notes(query)
+        # str.join materializes a generator into a list anyway, so build the list directly
+        lines = [f"- {note['title']} [ID: {note['pk']}]" for note in results]
         return [
             types.TextContent(
                 type="text",
-                text=f"Found {len(results)} notes:\n"
-                + "\n".join(
-                    f"- {note['title']} [ID: {note['pk']}]" for note in results
-                ),
+                text=f"Found {len(results)} notes:\n" + "\n".join(lines),
             )
         ]
 
     elif name == "get-all-notes":
-        notes = notes_db.get_all_notes()
+        limit = arguments.get("limit") if arguments else None
+        next_cursor = None
+        if limit is not None:
+            notes, next_cursor = notes_db.get_notes_page(
+                int(limit), arguments.get("cursor")
+            )
+        else:
+            notes = notes_db.get_all_notes()
+        lines = [f"- {note['title']}" for note in notes]
+        if next_cursor:
+            lines.append(f"\nMore notes available. Next cursor: {next_cursor}")
         return [
             types.TextContent(
                 type="text",
-                text="All notes:\n" + "\n".join(f"- {note['title']}" for note in notes),
+                text="All notes:\n" + "\n".join(lines),
             )
         ]
 
@@ -229,7 +234,7 @@ async def handle_call_tool(
         note_id = arguments.get("note_id")
         note = notes_db.get_note_content(note_id)
         if note:
-            decoded_content = decode_note_content(note["content"])
+            decoded_content = notes_db.read_note_content(note["contentId"])
             return [
                 types.TextContent(
                     type="text",
@@ -241,6 +246,23 @@ async def handle_call_tool(
             ]
         return [types.TextContent(type="text", text="Note not found")]
 
+    elif name == "read-notes":
+        note_ids = [str(note_id) for note_id in arguments.get("note_ids", [])]
+        notes = notes_db.get_notes_content(note_ids)
+        if not notes:
+            return [types.TextContent(type="text", text="No notes found")]
+        decoded = decode_notes_content([note["content"] for note in notes])
+        return [
+            types.TextContent(
+                type="text",
+                text=f"Title: {note['title']}\n"
+                f"Modified: {note['modifiedAt']}\n"
+                f"Folder: {note['folder']}\n"
+                f"\nContent:\n{decoded_content}",
+            )
+            for note, decoded_content in zip(notes, decoded)
+        ]
+
     else:
         raise ValueError(f"Unknown tool: {name}")
 
@@ -262,7 +284,7 @@ async def handle_get_prompt(
     results = notes_db.search_notes(query)
 
     notes_context = "\n".join(
-        f"- {note['title']}: {note['snippet']}" for note in results
+        [f"- {note['title']}: {note['snippet']}" for note in results]
     )
 
     return types.GetPromptResult(
@@ -289,27 +311,35 @@ async def handle_get_prompt(
     )
 
 
-async def main(db_path: str | None = None):
+async def main(db_path: str | None = None, index_path: str | None = None):
     # Run the server using stdin/stdout streams
 
     logger.info(f"Starting MCP server with db_path: {db_path}")
+    logger.info(f"Using protobuf implementation: {api_implementation.Type()}")
 
     global notes_db
-    notes_db = NotesDatabase(db_path) if db_path else NotesDatabase()
+    if db_path:
+        notes_db = NotesDatabase(db_path, index_path=index_path)
+    else:
+        notes_db = NotesDatabase(index_path=index_path)
+    logger.info(f"Using search index: {notes_db.index_path}")
 
     # Get the distribution info from the package
     dist = metadata.distribution("apple-notes-mcp")
 
-    async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream,
-            write_stream,
-            InitializationOptions(
-                server_name=dist.metadata["Name"],
-                server_version=dist.version,
-                capabilities=server.get_capabilities(
-                    notification_options=NotificationOptions(),
-                    experimental_capabilities={},
+    try:
+        async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
+            await server.run(
+                read_stream,
+                write_stream,
+                InitializationOptions(
+                    server_name=dist.metadata["Name"],
+                    server_version=dist.version,
+                    capabilities=server.get_capabilities(
+                        notification_options=NotificationOptions(),
+                        experimental_capabilities={},
+                    ),
                 ),
-            ),
-        )
+            )
+    finally:
+        notes_db.close()